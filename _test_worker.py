@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Warm worker process for the test suite.
+
+Imports the prompt enhancer once, then reads one JSON-encoded argument list
+per line from stdin, runs the CLI's main() with it and writes one JSON
+result line ({"rc": ..., "out": ..., "err": ...}) to stdout.
+
+Usage: python _test_worker.py path/to/claude_prompt_enhancer.py
+"""
+
+import io
+import sys
+import json
+import logging
+import importlib.util
+from contextlib import redirect_stdout, redirect_stderr
+from unittest.mock import patch
+
+
+def load_enhancer(script: str):
+    """Import the enhancer script as a module."""
+    spec = importlib.util.spec_from_file_location('claude_prompt_enhancer', script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_main(module, script: str, args: list) -> dict:
+    """
+    Run main() with the given arguments and capture its result.
+
+    Shared by the worker loop and the test runner's in-process mode. The CLI
+    sees an empty stdin: in the worker, stdin carries the requests, which a
+    run reading its prompt from stdin would otherwise consume.
+    """
+    stdin, out, err = io.StringIO(), io.StringIO(), io.StringIO()
+    try:
+        with patch.object(sys, 'argv', [script, *args]), patch.object(sys, 'stdin', stdin), \
+                redirect_stdout(out), redirect_stderr(err):
+            try:
+                module.main()
+                returncode = 0
+            except SystemExit as e:
+                if e.code is None:
+                    returncode = 0
+                elif isinstance(e.code, int):
+                    returncode = e.code
+                else:
+                    returncode = 1
+    except Exception as e:
+        return {'rc': -1, 'out': out.getvalue(), 'err': str(e)}
+    return {'rc': returncode, 'out': out.getvalue(), 'err': err.getvalue()}
+
+
+def main():
+    """Serve requests from stdin until it is closed."""
+    script = sys.argv[1]
+    results = sys.stdout
+
+    try:
+        module = load_enhancer(script)
+        error = None
+    except Exception as e:
+        module, error = None, f"Failed to import {script}: {e}"
+
+    # The enhancer's log handlers write to the real stderr; keep them quiet
+    logging.disable(logging.CRITICAL)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        if module is None:
+            result = {'rc': -1, 'out': '', 'err': error}
+        else:
+            result = run_main(module, script, json.loads(line))
+        results.write(json.dumps(result) + '\n')
+        results.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,10 +8,20 @@ well-structured, detailed instructions.
 """
 
 import os
+import re
 import sys
 import argparse
 import logging
-from typing import Optional, Dict, Tuple
+import logging.handlers
+import atexit
+import asyncio
+import queue
+import threading
+import functools
+import hashlib
+import json
+import shelve
+from typing import Optional, Dict, List, Tuple
 from pathlib import Path
 import anthropic
 from dotenv import load_dotenv
@@ -31,15 +41,25 @@ except ImportError:
         BRIGHT = RESET_ALL = ""
 
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('claude_enhancer.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging. Records are queued by the caller and written to the log
+# file and console by a background listener thread, so file writes never
+# block the enhancement path.
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('claude_enhancer.log'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,9 +71,228 @@ CLAUDE_MODELS = {
     'haiku-3.5': 'claude-3-5-haiku-20241022',
 }
 
+# Model names accepted by --target-model
+_MODEL_CHOICES = tuple(CLAUDE_MODELS)
+
 # Default token limit safety margin (5%)
 SAFETY_MARGIN = 0.05
 
+# SAFETY_MARGIN as integer percentages, so limits are computed with
+# integer arithmetic: limit * _EFFECTIVE_NUMERATOR // 100
+_EFFECTIVE_NUMERATOR = round((1 - SAFETY_MARGIN) * 100)
+_MARGIN_NUMERATOR = round((1 + SAFETY_MARGIN) * 100)
+
+# Location of the on-disk cache of enhancement results
+CACHE_DIR = Path.home() / '.cache' / 'claude-enhancer'
+
+# Once --warm-cache has created this directory, tiktoken's BPE files are read
+# from it so the encoder loads without network access. It is only used if it
+# exists: tiktoken treats write failures in a configured cache dir as fatal.
+TIKTOKEN_CACHE_DIR = CACHE_DIR / 'tiktoken'
+if TIKTOKEN_CACHE_DIR.is_dir():
+    os.environ.setdefault('TIKTOKEN_CACHE_DIR', str(TIKTOKEN_CACHE_DIR))
+
+# Minimum cosine similarity for a semantic cache hit
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+# Prompts that already use this much of the token limit and contain one of
+# these structural markers are returned as-is without calling the API
+_SKIP_ENHANCEMENT_RATIO = 0.7
+_STRUCTURE_MARKERS = ('You are', '##', '1.', '```')
+
+# Texts shorter than this are estimated without calling the tokenizer
+_SHORT_TEXT_CHARS = 16
+
+# Newlines and punctuation counted as extra tokens by the fallback estimator
+_FALLBACK_BOUNDARY_RE = re.compile(r'[\n.,;:!?()\[\]{}]')
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoder():
+    """Build the tiktoken encoder once and share it across all TokenCounters."""
+    # cl100k_base is similar to GPT-4's tokenizer and provides good estimates
+    # for Claude tokens. Construction is expensive, so it is cached here.
+    return tiktoken.get_encoding("cl100k_base")
+
+
+# Meta-prompt sent to Claude to enhance a user's prompt. The instructions are
+# identical for every request and are sent as a separate content block marked
+# for prompt caching; only the short request template varies per call.
+# Caching is currently inactive: the API only caches prefixes of at least 1024
+# tokens (2048 on Haiku) and these instructions are roughly 670 tokens.
+_ENHANCEMENT_INSTRUCTIONS = """You are an expert prompt engineer specializing in optimizing prompts for Claude AI models. Your task is to enhance the user prompt given after these instructions to maximize output quality while STRICTLY adhering to the specified token limit.
+
+ENHANCEMENT REQUIREMENTS:
+
+1. **Structure & Clarity**
+   - Break complex requests into logical sections
+   - Use clear headings and organization
+   - Number steps when sequence matters
+   - Separate concerns into distinct parts
+
+2. **Output Specifications**
+   - Define desired length, format, and structure
+   - Specify tone (formal, casual, technical, etc.)
+   - Indicate preferred formatting (markdown, bullet points, paragraphs)
+   - Set quality and depth expectations
+
+3. **Context & Background**
+   - Add relevant domain context
+   - Specify the intended audience
+   - Define success criteria
+   - Clarify the task's purpose and goals
+
+4. **Examples (when beneficial)**
+   - Provide concrete examples of desired output
+   - Show input/output patterns if applicable
+   - Illustrate edge cases to handle
+
+5. **Constraints & Requirements**
+   - Make implicit constraints explicit
+   - Define boundaries and limitations
+   - Specify what to avoid or exclude
+   - Set quality thresholds
+
+6. **Role-Based Framing (when appropriate)**
+   - Assign relevant expertise ("You are an expert...")
+   - Define perspective or viewpoint
+   - Set the appropriate knowledge level
+
+7. **Reasoning Guidance (for complex tasks)**
+   - Request step-by-step analysis
+   - Ask for consideration of multiple perspectives
+   - Specify decision-making criteria
+   - Request explanation of reasoning
+
+8. **Ambiguity Elimination**
+   - Replace vague terms with precise language
+   - Clarify potentially multiple interpretations
+   - Define domain-specific terminology
+   - Remove unnecessary jargon
+
+TOKEN MANAGEMENT STRATEGY:
+
+- **If token budget is generous (>2x original)**: Include comprehensive enhancements, multiple examples, extensive context, detailed formatting specs
+- **If token budget is tight (<1.5x original)**: Prioritize core task clarity, essential constraints, minimal necessary context
+- **If approaching limit**: Use concise language, combine related instructions, remove redundancy while preserving all critical information
+
+CRITICAL RULES:
+1. The enhanced prompt MUST stay within the effective token limit given below (with safety margin)
+2. Maintain the EXACT core intent of the original prompt
+3. Do NOT introduce unintended assumptions or constraints
+4. Do NOT change the fundamental task or goal
+5. Follow Anthropic's prompt engineering best practices
+6. Output ONLY the enhanced prompt, no commentary or explanations"""
+
+_ENHANCEMENT_TEMPLATE = """ORIGINAL PROMPT:
+{original_prompt}
+
+TARGET MODEL: {target_model}
+MAXIMUM TOKEN LIMIT: {token_limit} tokens (with 5% safety margin, aim for {effective_limit} tokens)
+
+Enhanced prompt:"""
+
+# Static instructions and per-request template for the compression fallback
+_COMPRESSION_INSTRUCTIONS = """Compress the prompt given after these instructions to fit within the token limit given below while preserving ALL critical information and intent.
+
+COMPRESSION RULES:
+1. Remove redundant phrasing
+2. Combine related instructions
+3. Use more concise language
+4. Keep all essential constraints and requirements
+5. Maintain clarity and precision
+6. Do NOT remove important context or specifications"""
+
+_COMPRESSION_TEMPLATE = """TOKEN LIMIT: {effective_limit} tokens
+
+PROMPT TO COMPRESS:
+{prompt}
+
+Output ONLY the compressed prompt, nothing else:"""
+
+
+@functools.lru_cache(maxsize=128)
+def _build_enhancement_prompt(
+    original_prompt: str,
+    token_limit: int,
+    target_model: str
+) -> str:
+    """Fill in the enhancement request template; repeated requests hit the cache."""
+    # Calculate effective token limit with safety margin
+    effective_limit = token_limit * _EFFECTIVE_NUMERATOR // 100
+
+    return _ENHANCEMENT_TEMPLATE.format_map({
+        'original_prompt': original_prompt,
+        'token_limit': token_limit,
+        'effective_limit': effective_limit,
+        'target_model': target_model,
+    })
+
+
+def _needs_enhancement(prompt: str, tokens: int, token_limit: int) -> bool:
+    """
+    Decide whether a prompt is worth sending to Claude for enhancement.
+
+    A prompt that is already structured and fills most of the token budget
+    leaves too little room for a meaningful improvement.
+
+    Args:
+        prompt: The original user prompt
+        tokens: Token count of the prompt
+        token_limit: Maximum tokens for the enhanced prompt
+
+    Returns:
+        False if the prompt should be returned unchanged
+    """
+    if not _SKIP_ENHANCEMENT_RATIO * token_limit < tokens <= token_limit:
+        return True
+    return not any(marker in prompt for marker in _STRUCTURE_MARKERS)
+
+
+# Content blocks carrying the static instructions. They are built once and
+# passed by reference in every request rather than rebuilt per call. Both are
+# below the API's minimum cacheable prefix, so cache_control has no effect
+# until the instructions grow past it; no caching saving is realised today.
+_ENHANCEMENT_BLOCK = {
+    "type": "text",
+    "text": _ENHANCEMENT_INSTRUCTIONS,
+    "cache_control": {"type": "ephemeral"}
+}
+_COMPRESSION_BLOCK = {
+    "type": "text",
+    "text": _COMPRESSION_INSTRUCTIONS,
+    "cache_control": {"type": "ephemeral"}
+}
+
+
+def _build_messages(instructions_block: Dict, request: str) -> list:
+    """
+    Build a single user message with cacheable static instructions.
+
+    Args:
+        instructions_block: Static instruction content block, identical across calls
+        request: Per-request text appended after the instructions
+
+    Returns:
+        The messages payload for the Claude API
+    """
+    return [{
+        "role": "user",
+        "content": [
+            instructions_block,
+            {
+                "type": "text",
+                "text": request
+            }
+        ]
+    }]
+
+
+async def _to_thread(func, *args, **kwargs):
+    """Run a blocking call in the default executor (asyncio.to_thread needs Python 3.9)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
 
 class TokenCounter:
     """Handle token counting for Claude prompts using tiktoken approximation."""
@@ -65,8 +304,7 @@ class TokenCounter:
 
         try:
             # Try to use cl100k_base as an approximation for Claude tokens
-            # This is similar to GPT-4's tokenizer and provides good estimates
-            self.encoder = tiktoken.get_encoding("cl100k_base")
+            self.encoder = _get_encoder()
             logger.info("Initialized tiktoken encoder successfully")
         except Exception as e:
             logger.warning(f"Could not initialize tiktoken: {e}")
@@ -83,6 +321,10 @@ class TokenCounter:
         Returns:
             The estimated number of tokens
         """
+        short_count = self._count_short(text)
+        if short_count is not None:
+            return short_count
+
         if self.use_fallback or self.encoder is None:
             # Fallback method: approximate token count
             # Based on typical Claude tokenization patterns:
@@ -91,20 +333,68 @@ class TokenCounter:
             words = text.split()
             # Rough estimate: count words, punctuation, and special chars
             token_estimate = len(words)  # Words
-            token_estimate += text.count('\n')  # Newlines
-            token_estimate += sum(text.count(p) for p in '.,;:!?()[]{}')  # Punctuation
+            # Newlines and punctuation, counted in a single regex pass
+            token_estimate += len(_FALLBACK_BOUNDARY_RE.findall(text))
             # Add extra for longer words (more likely to be split)
             token_estimate += sum(1 for w in words if len(w) > 10)
             return max(len(text) // 4, token_estimate)  # Use whichever is larger
 
         try:
-            tokens = self.encoder.encode(text)
+            # Only the length is needed, so skip special-token handling
+            tokens = self.encoder.encode_ordinary(text)
             return len(tokens)
         except Exception as e:
             logger.error(f"Error counting tokens: {e}")
             # Fallback to rough estimation: ~4 chars per token
             return len(text) // 4
 
+    @staticmethod
+    def _count_short(text: str) -> Optional[int]:
+        """Estimate empty or very short text directly, or return None for longer text."""
+        # The encoder call would cost more than it saves and is accurate to
+        # within a token anyway.
+        if not text:
+            return 0
+        if len(text) < _SHORT_TEXT_CHARS:
+            return max(1, len(text.split()) + text.count('\n'))
+        return None
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count the number of tokens in several text strings at once.
+
+        With tiktoken available, all texts are encoded in a single batched
+        call that runs on tiktoken's native thread pool.
+
+        Args:
+            texts: The texts to count tokens for
+
+        Returns:
+            The estimated number of tokens for each text, in order
+        """
+        if self.use_fallback or self.encoder is None:
+            return [self.count_tokens(text) for text in texts]
+
+        # Short texts get the same estimate as count_tokens gives them
+        counts = [self._count_short(text) for text in texts]
+        pending = [i for i, count in enumerate(counts) if count is None]
+        if not pending:
+            return counts
+
+        try:
+            batches = self.encoder.encode_ordinary_batch(
+                [texts[i] for i in pending],
+                num_threads=os.cpu_count() or 1
+            )
+            for i, tokens in zip(pending, batches):
+                counts[i] = len(tokens)
+        except Exception as e:
+            logger.error(f"Error counting tokens: {e}")
+            # Fallback to rough estimation: ~4 chars per token
+            for i in pending:
+                counts[i] = len(texts[i]) // 4
+        return counts
+
     def estimate_tokens_with_margin(self, text: str, margin: float = SAFETY_MARGIN) -> int:
         """
         Estimate tokens with a safety margin.
@@ -117,19 +407,227 @@ class TokenCounter:
             Token count with margin applied
         """
         base_count = self.count_tokens(text)
+        if margin == SAFETY_MARGIN:
+            return base_count * _MARGIN_NUMERATOR // 100
         return int(base_count * (1 + margin))
 
 
+class ResponseCache:
+    """Exact-match on-disk cache of enhancement results."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        """
+        Initialize the response cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+        """
+        self.path = cache_dir / 'responses'
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        target_model: str,
+        token_limit: int,
+        original_prompt: str
+    ) -> str:
+        """
+        Build the cache key for an enhancement request.
+
+        The enhancement instructions are hashed in as well, so results
+        produced by an older meta-prompt are never served.
+
+        Args:
+            model: Claude model used for enhancement
+            target_model: The Claude model the prompt will be used with
+            token_limit: Maximum tokens for the enhanced prompt
+            original_prompt: The original user prompt
+
+        Returns:
+            Hex digest identifying the request
+        """
+        material = (
+            f"{model}|{target_model}|{token_limit}|"
+            f"{_ENHANCEMENT_INSTRUCTIONS}|{original_prompt}"
+        )
+        return hashlib.blake2b(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            The cached result dictionary, or None on a miss
+        """
+        try:
+            with self._lock, shelve.open(str(self.path), flag='r') as db:
+                return db.get(key)
+        except Exception as e:
+            # A missing or unreadable cache is simply a miss
+            logger.debug(f"Response cache unavailable: {e}")
+            return None
+
+    def set(self, key: str, result: Dict):
+        """
+        Store a result in the cache.
+
+        Args:
+            key: Cache key from make_key()
+            result: Enhancement result dictionary
+        """
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock, shelve.open(str(self.path)) as db:
+                db[key] = result
+        except Exception as e:
+            logger.warning(f"Could not write response cache: {e}")
+
+
+class SemanticCache:
+    """
+    Similarity-based cache of enhancement results for near-duplicate prompts.
+
+    Prompts are embedded with a local sentence-transformers model and looked
+    up in a FAISS inner-product index. Requires the optional
+    sentence-transformers and faiss-cpu packages.
+    """
+
+    EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD
+    ):
+        """
+        Initialize the semantic cache, loading any persisted index.
+
+        Args:
+            cache_dir: Directory holding the index and cached results
+            threshold: Minimum cosine similarity for a hit
+
+        Raises:
+            ImportError: If sentence-transformers or faiss is not installed
+        """
+        # Imported here so the heavy dependencies only load when requested
+        import faiss
+        from sentence_transformers import SentenceTransformer
+
+        self._faiss = faiss
+        self._lock = threading.Lock()
+        self.threshold = threshold
+        self.index_path = cache_dir / 'semantic.faiss'
+        self.entries_path = cache_dir / 'semantic_entries.json'
+        self.model = SentenceTransformer(self.EMBEDDING_MODEL)
+
+        self.index = None
+        if self.index_path.exists() and self.entries_path.exists():
+            try:
+                index = faiss.read_index(str(self.index_path))
+                entries = json.loads(self.entries_path.read_text(encoding='utf-8'))
+            except Exception as e:
+                logger.warning(f"Could not read semantic cache, starting empty: {e}")
+            else:
+                # The two files are written one after the other; if only one
+                # write landed, index positions no longer match the entries
+                if index.ntotal == len(entries):
+                    self.index, self.entries = index, entries
+                else:
+                    logger.warning(
+                        f"Semantic cache index has {index.ntotal} vectors but "
+                        f"{len(entries)} entries, starting empty"
+                    )
+        if self.index is None:
+            dimension = self.model.get_sentence_embedding_dimension()
+            self.index = faiss.IndexFlatIP(dimension)
+            self.entries = []
+
+    def _embed(self, text: str):
+        """Embed text as a normalized vector so inner product is cosine similarity."""
+        return self.model.encode(
+            [text],
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ).astype('float32')
+
+    def get(self, prompt: str, scope: str) -> Optional[Dict]:
+        """
+        Find the cached result for the most similar prompt.
+
+        Args:
+            prompt: The original user prompt
+            scope: Request settings the cached result must share
+
+        Returns:
+            The cached result dictionary, or None on a miss
+        """
+        try:
+            query = self._embed(prompt)
+            with self._lock:
+                if self.index.ntotal == 0:
+                    return None
+
+                scores, ids = self.index.search(query, min(self.index.ntotal, 10))
+                for score, idx in zip(scores[0], ids[0]):
+                    if score < self.threshold:
+                        break
+                    entry = self.entries[idx]
+                    if entry['scope'] == scope:
+                        logger.debug(f"Semantic cache hit with similarity {score:.3f}")
+                        return entry['result']
+        except Exception as e:
+            # The semantic tier is optional; any failure is simply a miss
+            logger.debug(f"Semantic cache unavailable: {e}")
+        return None
+
+    def add(self, prompt: str, scope: str, result: Dict):
+        """
+        Store a result and persist the index.
+
+        Args:
+            prompt: The original user prompt
+            scope: Request settings the result was produced with
+            result: Enhancement result dictionary
+        """
+        try:
+            embedding = self._embed(prompt)
+            with self._lock:
+                self.index.add(embedding)
+                self.entries.append({'scope': scope, 'result': result})
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                self._faiss.write_index(self.index, str(self.index_path))
+                self.entries_path.write_text(json.dumps(self.entries), encoding='utf-8')
+        except Exception as e:
+            logger.warning(f"Could not write semantic cache: {e}")
+
+
 class PromptEnhancer:
     """Core prompt enhancement engine using Claude API."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = 'sonnet-4.5'):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = 'sonnet-4.5',
+        cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        token_counter: Optional[TokenCounter] = None
+    ):
         """
         Initialize the prompt enhancer.
 
         Args:
             api_key: Anthropic API key (if None, loads from environment)
             model: Claude model to use for enhancement
+            cache: Response cache to consult before calling the API
+                (if None, results are not cached)
+            semantic_cache: Similarity cache consulted after an exact-match
+                miss (if None, near-duplicate prompts are not matched)
+            token_counter: Token counter to share with the caller
+                (if None, a new one is created)
         """
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         if not self.api_key:
@@ -140,7 +638,9 @@ class PromptEnhancer:
 
         self.client = anthropic.Anthropic(api_key=self.api_key)
         self.model = CLAUDE_MODELS.get(model, CLAUDE_MODELS['sonnet-4.5'])
-        self.token_counter = TokenCounter()
+        self.token_counter = token_counter or TokenCounter()
+        self.cache = cache
+        self.semantic_cache = semantic_cache
         logger.info(f"Initialized PromptEnhancer with model: {self.model}")
 
     def _create_enhancement_prompt(
@@ -150,7 +650,10 @@ class PromptEnhancer:
         target_model: str
     ) -> str:
         """
-        Create the meta-prompt for Claude to enhance the user's prompt.
+        Create the per-request part of the enhancement meta-prompt.
+
+        The static instructions in _ENHANCEMENT_INSTRUCTIONS are sent ahead
+        of this text as a separate, cacheable content block.
 
         Args:
             original_prompt: The user's original prompt
@@ -158,84 +661,44 @@ class PromptEnhancer:
             target_model: The Claude model the enhanced prompt will be used with
 
         Returns:
-            The enhancement instruction prompt
+            The request text following the enhancement instructions
         """
-        # Calculate effective token limit with safety margin
-        effective_limit = int(token_limit * (1 - SAFETY_MARGIN))
-
-        enhancement_instructions = f"""You are an expert prompt engineer specializing in optimizing prompts for Claude AI models. Your task is to enhance the following user prompt to maximize output quality while STRICTLY adhering to the specified token limit.
-
-ORIGINAL PROMPT:
-{original_prompt}
-
-TARGET MODEL: {target_model}
-MAXIMUM TOKEN LIMIT: {token_limit} tokens (with 5% safety margin, aim for {effective_limit} tokens)
-
-ENHANCEMENT REQUIREMENTS:
-
-1. **Structure & Clarity**
-   - Break complex requests into logical sections
-   - Use clear headings and organization
-   - Number steps when sequence matters
-   - Separate concerns into distinct parts
-
-2. **Output Specifications**
-   - Define desired length, format, and structure
-   - Specify tone (formal, casual, technical, etc.)
-   - Indicate preferred formatting (markdown, bullet points, paragraphs)
-   - Set quality and depth expectations
-
-3. **Context & Background**
-   - Add relevant domain context
-   - Specify the intended audience
-   - Define success criteria
-   - Clarify the task's purpose and goals
-
-4. **Examples (when beneficial)**
-   - Provide concrete examples of desired output
-   - Show input/output patterns if applicable
-   - Illustrate edge cases to handle
-
-5. **Constraints & Requirements**
-   - Make implicit constraints explicit
-   - Define boundaries and limitations
-   - Specify what to avoid or exclude
-   - Set quality thresholds
-
-6. **Role-Based Framing (when appropriate)**
-   - Assign relevant expertise ("You are an expert...")
-   - Define perspective or viewpoint
-   - Set the appropriate knowledge level
-
-7. **Reasoning Guidance (for complex tasks)**
-   - Request step-by-step analysis
-   - Ask for consideration of multiple perspectives
-   - Specify decision-making criteria
-   - Request explanation of reasoning
-
-8. **Ambiguity Elimination**
-   - Replace vague terms with precise language
-   - Clarify potentially multiple interpretations
-   - Define domain-specific terminology
-   - Remove unnecessary jargon
-
-TOKEN MANAGEMENT STRATEGY:
+        return _build_enhancement_prompt(original_prompt, token_limit, target_model)
 
-- **If token budget is generous (>2x original)**: Include comprehensive enhancements, multiple examples, extensive context, detailed formatting specs
-- **If token budget is tight (<1.5x original)**: Prioritize core task clarity, essential constraints, minimal necessary context
-- **If approaching limit**: Use concise language, combine related instructions, remove redundancy while preserving all critical information
-
-CRITICAL RULES:
-1. The enhanced prompt MUST stay within {effective_limit} tokens (with safety margin)
-2. Maintain the EXACT core intent of the original prompt
-3. Do NOT introduce unintended assumptions or constraints
-4. Do NOT change the fundamental task or goal
-5. Follow Anthropic's prompt engineering best practices
-6. Output ONLY the enhanced prompt, no commentary or explanations
+    def _stream_message(
+        self,
+        messages: List[Dict],
+        temperature: float,
+        echo: bool = False
+    ) -> Tuple[str, anthropic.types.Message]:
+        """
+        Send a request to Claude and collect the streamed response text.
 
-Enhanced prompt:"""
+        Args:
+            messages: The messages payload for the Claude API
+            temperature: Sampling temperature
+            echo: Whether to write text to stdout as it arrives
 
-        return enhancement_instructions
+        Returns:
+            Tuple of the full response text and the final message
+        """
+        chunks = []
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=4096,
+            temperature=temperature,
+            messages=messages
+        ) as stream:
+            for text in stream.text_stream:
+                chunks.append(text)
+                if echo:
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+            response = stream.get_final_message()
+
+        if echo:
+            sys.stdout.write('\n')
+        return ''.join(chunks), response
 
     def enhance_prompt(
         self,
@@ -265,10 +728,54 @@ Enhanced prompt:"""
         if token_limit < 50:
             raise ValueError("Token limit must be at least 50 tokens")
 
+        # Serve identical requests from the response cache
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ResponseCache.make_key(
+                self.model, target_model, token_limit, original_prompt
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Returning cached enhancement (exact match)")
+                return dict(cached, cache_hit='exact')
+
         # Count original tokens
         original_tokens = self.token_counter.count_tokens(original_prompt)
         logger.info(f"Original prompt: {original_tokens} tokens")
 
+        # Skip the API call for prompts that would not benefit
+        if not _needs_enhancement(original_prompt, original_tokens, token_limit):
+            logger.info("Prompt is already well-structured; skipping enhancement")
+            return {
+                'original_prompt': original_prompt,
+                'enhanced_prompt': original_prompt,
+                'original_tokens': original_tokens,
+                'enhanced_tokens': original_tokens,
+                'token_limit': token_limit,
+                'within_limit': True,
+                'improvement_ratio': 1.0,
+                'target_model': target_model,
+                'enhancement_model': self.model,
+                'cache_hit': 'trivial'
+            }
+
+        # Reuse the result for a near-duplicate prompt, if one is cached
+        semantic_scope = f"{self.model}|{target_model}|{token_limit}"
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get(original_prompt, semantic_scope)
+            if cached is not None:
+                logger.info("Returning cached enhancement (semantic match)")
+                return dict(
+                    cached,
+                    original_prompt=original_prompt,
+                    original_tokens=original_tokens,
+                    improvement_ratio=(
+                        cached['enhanced_tokens'] / original_tokens
+                        if original_tokens > 0 else 0
+                    ),
+                    cache_hit='semantic'
+                )
+
         # Check if original already exceeds limit
         if original_tokens > token_limit:
             logger.warning(
@@ -284,22 +791,20 @@ Enhanced prompt:"""
         )
 
         if verbose:
-            logger.debug(f"Enhancement prompt length: {len(enhancement_prompt)} chars")
+            logger.debug(
+                f"Enhancement prompt length: "
+                f"{len(_ENHANCEMENT_INSTRUCTIONS) + len(enhancement_prompt)} chars"
+            )
 
         try:
             # Call Claude API for enhancement
             logger.info("Calling Claude API for enhancement...")
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
+            enhanced_prompt, response = self._stream_message(
+                _build_messages(_ENHANCEMENT_BLOCK, enhancement_prompt),
                 temperature=0.3,  # Lower temperature for more consistent enhancements
-                messages=[{
-                    "role": "user",
-                    "content": enhancement_prompt
-                }]
+                echo=verbose
             )
-
-            enhanced_prompt = response.content[0].text.strip()
+            enhanced_prompt = enhanced_prompt.strip()
 
             # Count enhanced tokens
             enhanced_tokens = self.token_counter.count_tokens(enhanced_prompt)
@@ -339,8 +844,17 @@ Enhanced prompt:"""
                 }
             }
 
+            # No API usage is incurred when the result is served again
+            cacheable = {k: v for k, v in result.items() if k != 'api_usage'}
+            if cache_key is not None:
+                self.cache.set(cache_key, cacheable)
+            if self.semantic_cache is not None:
+                self.semantic_cache.add(original_prompt, semantic_scope, cacheable)
+
             if verbose:
-                result['enhancement_instructions'] = enhancement_prompt
+                result['enhancement_instructions'] = (
+                    f"{_ENHANCEMENT_INSTRUCTIONS}\n\n{enhancement_prompt}"
+                )
 
             logger.info("Enhancement completed successfully")
             return result
@@ -369,35 +883,19 @@ Enhanced prompt:"""
         Returns:
             Compressed prompt
         """
-        effective_limit = int(token_limit * (1 - SAFETY_MARGIN))
-
-        compression_prompt = f"""Compress the following prompt to fit within {effective_limit} tokens while preserving ALL critical information and intent:
-
-PROMPT TO COMPRESS:
-{prompt}
-
-COMPRESSION RULES:
-1. Remove redundant phrasing
-2. Combine related instructions
-3. Use more concise language
-4. Keep all essential constraints and requirements
-5. Maintain clarity and precision
-6. Do NOT remove important context or specifications
+        effective_limit = token_limit * _EFFECTIVE_NUMERATOR // 100
 
-Output ONLY the compressed prompt, nothing else:"""
+        compression_prompt = _COMPRESSION_TEMPLATE.format_map({
+            'effective_limit': effective_limit,
+            'prompt': prompt,
+        })
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                temperature=0.2,
-                messages=[{
-                    "role": "user",
-                    "content": compression_prompt
-                }]
+            compressed, _ = self._stream_message(
+                _build_messages(_COMPRESSION_BLOCK, compression_prompt),
+                temperature=0.2
             )
-
-            compressed = response.content[0].text.strip()
+            compressed = compressed.strip()
             compressed_tokens = self.token_counter.count_tokens(compressed)
 
             if compressed_tokens <= token_limit:
@@ -418,28 +916,156 @@ Output ONLY the compressed prompt, nothing else:"""
             raise
 
 
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser."""
+    parser = argparse.ArgumentParser(
+        description='Claude Prompt Enhancer - Optimize prompts for Claude API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Interactive mode:
+    %(prog)s -t 2000
+
+  File mode:
+    %(prog)s -i input.txt -o enhanced.txt -t 2000
+
+  Several files at once:
+    %(prog)s --inputs a.txt b.txt -o enhanced/ -t 2000
+
+  Dry run:
+    %(prog)s -i input.txt -t 2000 --dry-run
+
+  Cache tokenizer files for offline use:
+    %(prog)s --warm-cache
+
+  Comparison mode:
+    %(prog)s -i input.txt -t 2000 --compare
+
+  Verbose output:
+    %(prog)s -i input.txt -t 2000 -v
+        """
+    )
+
+    # Input options
+    input_group = parser.add_mutually_exclusive_group()
+    input_group.add_argument(
+        '-i', '--input',
+        type=str,
+        help='Input file containing the prompt to enhance'
+    )
+    input_group.add_argument(
+        '--inputs',
+        type=str,
+        nargs='+',
+        metavar='INPUT',
+        help='Several input files to enhance concurrently'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        help='Output file for the enhanced prompt '
+             '(output directory when used with --inputs)'
+    )
+
+    # Enhancement options
+    parser.add_argument(
+        '-t', '--token-limit',
+        type=int,
+        help='Maximum token limit for the enhanced prompt (required)'
+    )
+    parser.add_argument(
+        '-m', '--target-model',
+        type=str,
+        default='opus-4.1',
+        choices=_MODEL_CHOICES,
+        help='Target Claude model for the enhanced prompt (default: opus-4.1)'
+    )
+
+    # Mode options
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Show what would be done without making API calls'
+    )
+    parser.add_argument(
+        '--warm-cache',
+        action='store_true',
+        help="Download tiktoken's encoding files for offline use and exit"
+    )
+    parser.add_argument(
+        '--compare',
+        action='store_true',
+        help='Show side-by-side comparison of original and enhanced prompts'
+    )
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Enable verbose output for debugging'
+    )
+
+    # Cache options
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Bypass the local cache of previous enhancement results'
+    )
+    parser.add_argument(
+        '--semantic-cache',
+        action='store_true',
+        help='Also reuse cached results for near-duplicate prompts '
+             '(requires sentence-transformers and faiss-cpu)'
+    )
+
+    # API configuration
+    parser.add_argument(
+        '--api-key',
+        type=str,
+        help='Anthropic API key (overrides ANTHROPIC_API_KEY env var)'
+    )
+
+    return parser
+
+
 class CLIInterface:
     """Command-line interface for the prompt enhancer."""
 
+    # Argument parser, built on first use and shared by all instances
+    _parser = None
+
     def __init__(self):
         """Initialize the CLI interface."""
         self.enhancer = None
         self.token_counter = TokenCounter()
 
+        # Escape-code prefix for each (color, bright) pair used by format_colored
+        self._palette = {}
+        if COLORS_AVAILABLE:
+            self._palette = {
+                (name, bright): (Style.BRIGHT if bright else "") + getattr(Fore, name.upper())
+                for name in ('red', 'green', 'yellow', 'blue', 'cyan', 'magenta', 'white')
+                for bright in (True, False)
+            }
+
+    def format_colored(self, text: str, color: str = None, bright: bool = False) -> str:
+        """Return text wrapped in color codes if colorama is available."""
+        prefix = self._palette.get((color, bright))
+        return f"{prefix}{text}{Style.RESET_ALL}" if prefix else text
+
+    def format_header(self, text: str) -> str:
+        """Return a section header."""
+        return "\n".join([
+            self.format_colored(f"\n{'='*70}", 'cyan'),
+            self.format_colored(f"  {text}", 'cyan', bright=True),
+            self.format_colored(f"{'='*70}", 'cyan'),
+        ])
+
     def print_colored(self, text: str, color: str = None, bright: bool = False):
         """Print colored text if colorama is available."""
-        if COLORS_AVAILABLE and color:
-            color_code = getattr(Fore, color.upper(), Fore.WHITE)
-            style = Style.BRIGHT if bright else ""
-            print(f"{style}{color_code}{text}{Style.RESET_ALL}")
-        else:
-            print(text)
+        print(self.format_colored(text, color, bright))
 
     def print_header(self, text: str):
         """Print a section header."""
-        self.print_colored(f"\n{'='*70}", 'cyan')
-        self.print_colored(f"  {text}", 'cyan', bright=True)
-        self.print_colored(f"{'='*70}", 'cyan')
+        print(self.format_header(text))
 
     def print_separator(self):
         """Print a separator line."""
@@ -449,49 +1075,64 @@ class CLIInterface:
         """
         Display enhancement results to the user.
 
+        The output is assembled in memory and written to stdout at once.
+
         Args:
             results: Enhancement results dictionary
             show_comparison: Whether to show side-by-side comparison
         """
-        self.print_header("ENHANCEMENT RESULTS")
+        colored = self.format_colored
+        lines = [self.format_header("ENHANCEMENT RESULTS")]
 
         # Token statistics
-        self.print_colored("\n📊 Token Statistics:", 'yellow', bright=True)
-        print(f"  Original tokens:  {results['original_tokens']}")
-        print(f"  Enhanced tokens:  {results['enhanced_tokens']}")
-        print(f"  Token limit:      {results['token_limit']}")
-        print(f"  Improvement:      {results['improvement_ratio']:.2f}x")
+        lines.append(colored("\n📊 Token Statistics:", 'yellow', bright=True))
+        lines.append(f"  Original tokens:  {results['original_tokens']}")
+        lines.append(f"  Enhanced tokens:  {results['enhanced_tokens']}")
+        lines.append(f"  Token limit:      {results['token_limit']}")
+        lines.append(f"  Improvement:      {results['improvement_ratio']:.2f}x")
 
         # Status
         status_color = 'green' if results['within_limit'] else 'red'
         status_text = '✓ Within limit' if results['within_limit'] else '✗ Exceeds limit'
-        self.print_colored(f"  Status:           {status_text}", status_color, bright=True)
+        lines.append(colored(f"  Status:           {status_text}", status_color, bright=True))
+        if results.get('cache_hit') == 'trivial':
+            lines.append(colored(
+                "  Skipped:          already well-structured (no API call)",
+                'green'
+            ))
+        elif results.get('cache_hit'):
+            lines.append(colored(
+                f"  Cache:            {results['cache_hit']} match (no API call)",
+                'green'
+            ))
 
         # API usage
         if 'api_usage' in results:
-            self.print_colored("\n🔧 API Usage:", 'yellow', bright=True)
-            print(f"  Input tokens:     {results['api_usage']['input_tokens']}")
-            print(f"  Output tokens:    {results['api_usage']['output_tokens']}")
+            lines.append(colored("\n🔧 API Usage:", 'yellow', bright=True))
+            lines.append(f"  Input tokens:     {results['api_usage']['input_tokens']}")
+            lines.append(f"  Output tokens:    {results['api_usage']['output_tokens']}")
 
         # Model info
-        self.print_colored("\n🤖 Models:", 'yellow', bright=True)
-        print(f"  Enhancement:      {results['enhancement_model']}")
-        print(f"  Target:           {results['target_model']}")
+        lines.append(colored("\n🤖 Models:", 'yellow', bright=True))
+        lines.append(f"  Enhancement:      {results['enhancement_model']}")
+        lines.append(f"  Target:           {results['target_model']}")
 
         # Enhanced prompt
-        self.print_header("ENHANCED PROMPT")
-        print(results['enhanced_prompt'])
+        lines.append(self.format_header("ENHANCED PROMPT"))
+        lines.append(results['enhanced_prompt'])
 
         # Comparison mode
         if show_comparison:
-            self.print_header("COMPARISON VIEW")
-            self.print_colored("\n[ORIGINAL]", 'red', bright=True)
-            print(results['original_prompt'])
-            self.print_separator()
-            self.print_colored("\n[ENHANCED]", 'green', bright=True)
-            print(results['enhanced_prompt'])
+            lines.append(self.format_header("COMPARISON VIEW"))
+            lines.append(colored("\n[ORIGINAL]", 'red', bright=True))
+            lines.append(results['original_prompt'])
+            lines.append(colored('-' * 70, 'blue'))
+            lines.append(colored("\n[ENHANCED]", 'green', bright=True))
+            lines.append(results['enhanced_prompt'])
 
-        print()  # Final newline
+        lines.append("")  # Final newline
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def interactive_mode(self, args):
         """Run the tool in interactive mode."""
@@ -539,11 +1180,11 @@ class CLIInterface:
                 'red',
                 bright=True
             )
-            return
+            sys.exit(1)
 
         # Read input
         try:
-            original_prompt = input_file.read_text(encoding='utf-8').strip()
+            original_prompt = input_file.read_bytes().decode('utf-8').strip()
         except Exception as e:
             self.print_colored(
                 f"✗ Error reading input file: {e}",
@@ -590,6 +1231,151 @@ class CLIInterface:
             self.print_colored(f"✗ Enhancement failed: {e}", 'red', bright=True)
             logger.error(f"Enhancement failed: {e}", exc_info=True)
 
+    async def _enhance_files(self, args) -> List[Tuple[Path, object, Optional[Exception]]]:
+        """
+        Read, enhance and save several input files concurrently.
+
+        Each file succeeds or fails on its own; an unreadable input, a failed
+        enhancement or a failed write does not affect the other files.
+
+        Args:
+            args: Parsed command-line arguments
+
+        Returns:
+            List of (input file, results dictionary or raised exception,
+            exception raised while saving the output or None) for every
+            input file that could be read
+        """
+        input_files = [Path(name) for name in args.inputs]
+        contents = await asyncio.gather(*(
+            _to_thread(input_file.read_bytes)
+            for input_file in input_files
+        ), return_exceptions=True)
+
+        prompts = []
+        for input_file, content in zip(input_files, contents):
+            if not isinstance(content, Exception):
+                try:
+                    content = content.decode('utf-8').strip()
+                except UnicodeDecodeError as e:
+                    content = e
+            prompts.append(content)
+
+        readable = [
+            (input_file, prompt)
+            for input_file, prompt in zip(input_files, prompts)
+            if not isinstance(prompt, Exception)
+        ]
+
+        # Show original info
+        original_tokens = iter(self.token_counter.count_tokens_batch([prompt for _, prompt in readable]))
+        for input_file, prompt in zip(input_files, prompts):
+            self.print_colored(f"\n📂 Processing: {input_file}", 'cyan', bright=True)
+            if isinstance(prompt, Exception):
+                self.print_colored(f"   ✗ Could not read file: {prompt}", 'red')
+                logger.error(f"Reading {input_file} failed: {prompt}")
+            else:
+                print(f"   Original: {next(original_tokens)} tokens")
+
+        # The synchronous client is thread-safe and shares one connection
+        # pool, so each enhancement runs in a worker thread and the API
+        # round-trips overlap. Streaming echo is disabled as it would
+        # interleave between files.
+        outcomes = await asyncio.gather(*(
+            _to_thread(
+                self.enhancer.enhance_prompt,
+                prompt,
+                args.token_limit,
+                args.target_model
+            )
+            for _, prompt in readable
+        ), return_exceptions=True)
+
+        # Write outputs if an output directory is specified
+        write_errors = [None] * len(readable)
+        if args.output:
+            output_dir = Path(args.output)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            written = [
+                i for i, outcome in enumerate(outcomes)
+                if not isinstance(outcome, Exception)
+            ]
+            results = await asyncio.gather(*(
+                _to_thread(
+                    (output_dir / readable[i][0].name).write_text,
+                    outcomes[i]['enhanced_prompt'],
+                    encoding='utf-8'
+                )
+                for i in written
+            ), return_exceptions=True)
+            for i, result in zip(written, results):
+                if isinstance(result, Exception):
+                    write_errors[i] = result
+
+        return [
+            (input_file, outcome, write_error)
+            for (input_file, _), outcome, write_error in zip(readable, outcomes, write_errors)
+        ]
+
+    def batch_mode(self, args):
+        """Process prompts from several input files concurrently."""
+        missing = [name for name in args.inputs if not Path(name).exists()]
+        if missing:
+            for name in missing:
+                self.print_colored(
+                    f"✗ Error: Input file not found: {name}",
+                    'red',
+                    bright=True
+                )
+            sys.exit(1)
+
+        # Outputs are named after their input file, so names must not collide
+        if args.output:
+            seen = {}
+            for name in args.inputs:
+                seen.setdefault(Path(name).name, []).append(name)
+            duplicates = [names for names in seen.values() if len(names) > 1]
+            if duplicates:
+                for names in duplicates:
+                    self.print_colored(
+                        f"✗ Error: Input files would overwrite each other in {args.output}: "
+                        f"{', '.join(names)}",
+                        'red',
+                        bright=True
+                    )
+                sys.exit(1)
+
+        try:
+            outcomes = asyncio.run(self._enhance_files(args))
+        except Exception as e:
+            self.print_colored(f"✗ Error processing input files: {e}", 'red', bright=True)
+            logger.error(f"Batch processing failed: {e}", exc_info=True)
+            return
+
+        for input_file, outcome, write_error in outcomes:
+            self.print_header(f"FILE: {input_file}")
+            if isinstance(outcome, Exception):
+                self.print_colored(f"✗ Enhancement failed: {outcome}", 'red', bright=True)
+                logger.error(f"Enhancement failed for {input_file}: {outcome}")
+                continue
+
+            if args.output:
+                output_file = Path(args.output) / input_file.name
+                if write_error is not None:
+                    self.print_colored(
+                        f"✗ Could not save enhanced prompt to {output_file}: {write_error}",
+                        'red',
+                        bright=True
+                    )
+                    logger.error(f"Saving {output_file} failed: {write_error}")
+                else:
+                    self.print_colored(
+                        f"✓ Enhanced prompt saved to: {output_file}",
+                        'green',
+                        bright=True
+                    )
+            self.display_results(outcome, show_comparison=args.compare)
+
     def dry_run_mode(self, args):
         """Show what would be done without making API calls."""
         self.print_header("DRY RUN MODE")
@@ -602,8 +1388,8 @@ class CLIInterface:
                     'red',
                     bright=True
                 )
-                return
-            prompt = input_file.read_text(encoding='utf-8').strip()
+                sys.exit(1)
+            prompt = input_file.read_bytes().decode('utf-8').strip()
         else:
             print("\nEnter your prompt (press Ctrl+D or Ctrl+Z when done):")
             print("───────────────────────────────────────────────────────")
@@ -651,80 +1437,40 @@ class CLIInterface:
 
         self.print_colored("\n✓ Dry run complete. Use without --dry-run to execute.", 'green', bright=True)
 
-    def run(self):
-        """Run the CLI application."""
-        parser = argparse.ArgumentParser(
-            description='Claude Prompt Enhancer - Optimize prompts for Claude API',
-            formatter_class=argparse.RawDescriptionHelpFormatter,
-            epilog="""
-Examples:
-  Interactive mode:
-    %(prog)s -t 2000
-
-  File mode:
-    %(prog)s -i input.txt -o enhanced.txt -t 2000
-
-  Dry run:
-    %(prog)s -i input.txt -t 2000 --dry-run
-
-  Comparison mode:
-    %(prog)s -i input.txt -t 2000 --compare
-
-  Verbose output:
-    %(prog)s -i input.txt -t 2000 -v
-            """
-        )
+    def warm_cache_mode(self):
+        """Populate the local tiktoken cache so later runs work offline."""
+        if 'TIKTOKEN_CACHE_DIR' not in os.environ:
+            os.environ['TIKTOKEN_CACHE_DIR'] = str(TIKTOKEN_CACHE_DIR)
+        cache_dir = Path(os.environ['TIKTOKEN_CACHE_DIR'])
 
-        # Input options
-        parser.add_argument(
-            '-i', '--input',
-            type=str,
-            help='Input file containing the prompt to enhance'
-        )
-        parser.add_argument(
-            '-o', '--output',
-            type=str,
-            help='Output file for the enhanced prompt'
-        )
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # Load the BPE file through the encoding's constructor rather than
+            # _get_encoder(): an encoder built earlier in this process (e.g.
+            # by a TokenCounter) is reused from memory and never touches the
+            # cache directory
+            from tiktoken_ext import openai_public
+            openai_public.cl100k_base()
+        except Exception as e:
+            self.print_colored(f"✗ Could not download tiktoken encoding: {e}", 'red', bright=True)
+            logger.error(f"Cache warming failed: {e}", exc_info=True)
+            sys.exit(1)
 
-        # Enhancement options
-        parser.add_argument(
-            '-t', '--token-limit',
-            type=int,
-            required=True,
-            help='Maximum token limit for the enhanced prompt'
-        )
-        parser.add_argument(
-            '-m', '--target-model',
-            type=str,
-            default='opus-4.1',
-            choices=list(CLAUDE_MODELS.keys()),
-            help='Target Claude model for the enhanced prompt (default: opus-4.1)'
-        )
+        if not any(cache_dir.iterdir()):
+            self.print_colored(
+                f"✗ tiktoken did not write its encoding to: {cache_dir}",
+                'red',
+                bright=True
+            )
+            sys.exit(1)
 
-        # Mode options
-        parser.add_argument(
-            '--dry-run',
-            action='store_true',
-            help='Show what would be done without making API calls'
-        )
-        parser.add_argument(
-            '--compare',
-            action='store_true',
-            help='Show side-by-side comparison of original and enhanced prompts'
-        )
-        parser.add_argument(
-            '-v', '--verbose',
-            action='store_true',
-            help='Enable verbose output for debugging'
-        )
+        self.print_colored(f"✓ tiktoken encoding cached in: {cache_dir}", 'green', bright=True)
 
-        # API configuration
-        parser.add_argument(
-            '--api-key',
-            type=str,
-            help='Anthropic API key (overrides ANTHROPIC_API_KEY env var)'
-        )
+    def run(self):
+        """Run the CLI application."""
+        if CLIInterface._parser is None:
+            CLIInterface._parser = build_parser()
+        parser = CLIInterface._parser
 
         args = parser.parse_args()
 
@@ -732,16 +1478,47 @@ Examples:
         if args.verbose:
             logger.setLevel(logging.DEBUG)
 
+        # Cache warming doesn't need a prompt or token limit
+        if args.warm_cache:
+            self.warm_cache_mode()
+            return
+
+        if args.token_limit is None:
+            parser.error("the following arguments are required: -t/--token-limit")
+
         # Dry run mode doesn't need API key
         if args.dry_run:
-            self.dry_run_mode(args)
+            if args.inputs:
+                for name in args.inputs:
+                    self.dry_run_mode(argparse.Namespace(**dict(vars(args), input=name)))
+            else:
+                self.dry_run_mode(args)
             return
 
+        semantic_cache = None
+        if args.semantic_cache and not args.no_cache:
+            try:
+                semantic_cache = SemanticCache()
+            except ImportError as e:
+                self.print_colored(
+                    f"⚠ Semantic cache disabled: {e}. "
+                    "Install with: pip install sentence-transformers faiss-cpu",
+                    'yellow'
+                )
+            except Exception as e:
+                # The tier is optional: a model that cannot be loaded (e.g.
+                # offline) or an unreadable index must not stop the run
+                self.print_colored(f"⚠ Semantic cache disabled: {e}", 'yellow')
+                logger.warning(f"Semantic cache initialization failed: {e}", exc_info=True)
+
         # Initialize enhancer
         try:
             self.enhancer = PromptEnhancer(
                 api_key=args.api_key,
-                model='sonnet-4.5'
+                model='sonnet-4.5',
+                cache=None if args.no_cache else ResponseCache(),
+                semantic_cache=semantic_cache,
+                token_counter=self.token_counter
             )
         except ValueError as e:
             self.print_colored(f"✗ Configuration error: {e}", 'red', bright=True)
@@ -759,7 +1536,9 @@ Examples:
             return
 
         # Run appropriate mode
-        if args.input:
+        if args.inputs:
+            self.batch_mode(args)
+        elif args.input:
             self.file_mode(args)
         else:
             self.interactive_mode(args)